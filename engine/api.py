@@ -1,5 +1,4 @@
 import json
-from threading import Thread
 from fastapi import FastAPI, Request
 from fastapi.responses import StreamingResponse
 import modal
@@ -10,6 +9,7 @@ import runner
 DEVEL_IMAGE_NAME = "nvidia/cuda:12.8.0-devel-ubuntu22.04"
 RUNTIME_IMAGE_NAME = "nvidia/cuda:12.8.0-runtime-ubuntu22.04"
 CURR_DIR = Path(__file__).parent
+NVCC_CACHE_DIR = "/nvcc-cache"
 
 
 PIP_PACKAGES = ["torch", "numpy", "fastapi[standard]", "triton"]
@@ -18,7 +18,7 @@ LOCAL_SOURCE = ["utils", "runner", "problem"]
 devel_image = (
     modal.Image.from_registry(DEVEL_IMAGE_NAME, add_python="3.11")
     .apt_install(["build-essential", "gcc", "g++"])
-    .env({"CC": "gcc"})
+    .env({"CC": "gcc", "NVCC_CACHE_DIR": NVCC_CACHE_DIR})
     .pip_install(PIP_PACKAGES)
     .add_local_python_source(*LOCAL_SOURCE)
 )
@@ -26,12 +26,13 @@ devel_image = (
 runtime_image = (
     modal.Image.from_registry(RUNTIME_IMAGE_NAME, add_python="3.11")
     .apt_install(["build-essential", "gcc", "g++"])
-    .env({"CC": "gcc"})
+    .env({"CC": "gcc", "PYTORCH_CUDA_ALLOC_CONF": "expandable_segments:True"})
     .pip_install(PIP_PACKAGES)
     .add_local_python_source(*LOCAL_SOURCE)
 )
 
 app = modal.App("tensara", image=devel_image)
+nvcc_cache_volume = modal.Volume.from_name("tensara-nvcc-cache", create_if_missing=True)
 web_app = FastAPI()
 
 
@@ -79,20 +80,14 @@ async def checker(gpu: str, request: Request):
     language = req["language"]
     problem_name = utils.convert_slug_to_module_name(req["problem"])
 
+    # StreamingResponse iterates sync generators in a worker thread, so compiling
+    # here doesn't block the event loop. The compiled binary is cached under a
+    # key shared with the benchmark endpoint, so a later benchmark of the same
+    # code doesn't recompile.
     def create_stream():
         yield {"status": "COMPILING"}
 
-        def compile_benchmark():
-            try:
-                utils.run_nvcc_and_return_bytes(gpu, solution_code, "solution")
-            except Exception:
-                pass
-
-
         if language == "cuda":
-            bench_thr = Thread(target=compile_benchmark)
-            bench_thr.start()
-
             try:
                 checker_compiled = utils.run_nvcc_and_return_bytes(gpu, solution_code, "checker")
             except utils.NVCCError as e:
@@ -102,8 +97,6 @@ async def checker(gpu: str, request: Request):
                     "details": e.args[0],
                 }
                 return
-
-            bench_thr.join()
         else:
             checker_compiled = None
 
@@ -152,7 +145,7 @@ async def benchmark(gpu: str, request: Request):
     return StreamingResponse(stream, media_type="text/event-stream")
 
 
-@app.function()
+@app.function(volumes={NVCC_CACHE_DIR: nvcc_cache_volume})
 @modal.asgi_app()
 def fastapi_app():
     return web_app
\ No newline at end of file
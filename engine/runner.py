@@ -1,4 +1,3 @@
-import ctypes
 import torch
 import gc
 from typing import Iterator
@@ -102,16 +101,10 @@ def run_checker(problem_name: str, problem_def: str, compiled: bytes | None, sol
             actual_output = torch.zeros_like(expected_output, device='cuda')  # Ensure it's on GPU
 
             if language == "cuda":
-                input_ptrs = []
-                for tensor, argtype in zip(input_tensors, solution_func.argtypes[:len(input_tensors)]):
-                    if isinstance(tensor, torch.Tensor):
-                        input_ptrs.append(ctypes.cast(tensor.data_ptr(), argtype))
-                    else:
-                        input_ptrs.append(argtype(tensor))
-                output_ptr = ctypes.cast(actual_output.data_ptr(), solution_func.argtypes[len(input_ptrs)])
                 extra_params = problem.get_extra_params(test_case)
-                extra_params_casted = utils.cast_to_ctype(extra_params, solution_func.argtypes[-len(extra_params):], language)
-                solution_func(*(input_ptrs + [output_ptr] + extra_params_casted))
+                cast_args = utils.make_ctype_caster(tuple(solution_func.argtypes))
+                solution_args = cast_args(*input_tensors, actual_output, *extra_params)
+                solution_func(*solution_args)
             else:
                 extra_params = problem.get_extra_params(test_case)
                 solution_func(*(list(input_tensors) + [actual_output] + list(extra_params)))
@@ -132,7 +125,7 @@ def run_checker(problem_name: str, problem_def: str, compiled: bytes | None, sol
             # Clean up memory
             del input_tensors, expected_output, actual_output
             if language == "cuda":
-                del input_ptrs, output_ptr
+                del solution_args
             gc.collect()
             torch.cuda.empty_cache()
 
@@ -252,6 +245,7 @@ def run_benchmark(problem_name: str, problem_def: str, compiled: bytes | None, s
         
         # Initialize statistics
         benchmark_results = []
+        output_buffer = None
         
         # Prepare GPU for benchmarking (one-time setup at the beginning)
         utils.prepare_gpu()
@@ -264,7 +258,8 @@ def run_benchmark(problem_name: str, problem_def: str, compiled: bytes | None, s
                 # Create inputs and reference output
                 input_tensors = test_case["create_inputs"]()
                 expected_output = problem.reference_solution(*input_tensors).cpu()
-                actual_output = torch.zeros_like(expected_output, device='cuda')
+                output_buffer = utils.get_output_buffer(output_buffer, expected_output)
+                actual_output = output_buffer
                 
                 benchmark_result = utils.run_dynamic_benchmark(
                     solution_func, 
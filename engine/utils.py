@@ -1,19 +1,19 @@
 from functools import lru_cache, wraps
 import os
 from fastapi import HTTPException
-import importlib
 from problem import Problem
 import torch
 import time
 import ctypes
-import statistics
+import hashlib
 import subprocess
 import tempfile
 from pathlib import Path
-import importlib.util
 from types import ModuleType
 import multiprocessing as mp
-import queue
+import threading
+from concurrent.futures import Future
+from collections import OrderedDict
 import math
 
 
@@ -32,6 +32,29 @@ GPU_COMPUTE_CAPABILITIES = {
     "L4": "89"
 }
 
+# Bump to invalidate every entry in the on-disk nvcc cache
+NVCC_CACHE_VERSION = "2"
+NVCC_CACHE_DIR = Path(os.environ.get("NVCC_CACHE_DIR", Path.home() / ".cache" / "tensara" / "nvcc"))
+# Least recently used binaries beyond this many are pruned after each compile (~1MB each)
+NVCC_CACHE_MAX_ENTRIES = int(os.environ.get("NVCC_CACHE_MAX_ENTRIES", 4096))
+# Leftover temp files from interrupted writes older than this (in seconds) are pruned too
+NVCC_CACHE_TMP_MAX_AGE = 3600
+
+# nvcc -t threads for a compile that has the machine to itself; concurrent
+# compiles use a single thread each since they already keep the cores busy
+NVCC_MAX_THREADS = min(4, os.cpu_count() or 1)
+_nvcc_inflight = 0
+_nvcc_inflight_lock = threading.Lock()
+
+# Binaries that could not be written to the disk cache (volume missing, read-only
+# or full), kept in a small LRU so they are not recompiled on every request
+NVCC_FALLBACK_CACHE_SIZE = 32
+_nvcc_fallback_cache: OrderedDict[str, bytes] = OrderedDict()
+
+# In-flight compilations by cache key, so identical concurrent requests run nvcc once
+_nvcc_futures: dict[str, Future] = {}
+_nvcc_lock = threading.Lock()
+
 class NVCCError(Exception):
     pass
 
@@ -40,17 +63,42 @@ def get_nvidia_smi():
     process = subprocess.run(["nvidia-smi"], capture_output=True, text=True)
     return str(process.stdout)
 
-def nvcc_command(gpu: str, srcs: list[Path | str], out: Path | str):
-    """Get nvcc command for the given GPU, source files, and output file"""
+@lru_cache(maxsize=1)
+def get_nvcc_version():
+    """Get nvcc --version output
+    
+    Raises:
+        NVCCError: If nvcc --version fails, so a failed run isn't cached and
+            folded into every compile cache key
+    """
+    process = subprocess.run(["nvcc", "--version"], capture_output=True, text=True)
+    if process.returncode != 0 or not process.stdout.strip():
+        raise NVCCError(f"nvcc --version failed: {process.stderr}")
+    return str(process.stdout)
+
+def nvcc_cache_key(gpu: str, solution_code: str) -> str:
+    """Get the content-addressed cache key for compiling the solution code for the given GPU"""
+    h = hashlib.sha256()
+    for part in (NVCC_CACHE_VERSION, GPU_COMPUTE_CAPABILITIES[gpu], get_nvcc_version(), solution_code):
+        h.update(part.encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+def nvcc_command(gpu: str, srcs: list[Path | str], out: Path | str, threads: int = 1):
+    """Get nvcc command for the given GPU, source files, output file, and number of compile threads"""
     srcs = [str(src) for src in srcs]
     out = str(out)
     sm = GPU_COMPUTE_CAPABILITIES[gpu]
     
     # Building the command similar to your Makefile
-    cmd = ["nvcc", "-std=c++20", "-O2", "-Xcompiler", "-fPIC"]
+    cmd = ["nvcc", "-std=c++20", "-O2", "-Xcompiler", "-fPIC", "-t", str(threads)]
     
-    # Add architecture flags
-    cmd.extend([f"-arch=compute_{sm}", f"-code=sm_{sm}"])
+    # Add architecture flags: a cubin for the target SM, plus PTX for the same
+    # virtual architecture so newer GPUs can still load the binary
+    cmd.extend([
+        f"-gencode=arch=compute_{sm},code=sm_{sm}",
+        f"-gencode=arch=compute_{sm},code=compute_{sm}",
+    ])
     
     # Add shared library flag since, we are building a shared library
     if str(out).endswith('.so'):
@@ -76,71 +124,165 @@ def sanitize_floats(obj):
     else:
         return obj
     
-def hash_dict(func):
-    """Transform mutable dictionnary
-    Into immutable
-    Useful to be compatible with cache
-    """
-
-    class HDict(dict):
-        def __hash__(self):
-            return hash(frozenset(self.items()))
-
-    @wraps(func)
-    def wrapped(*args, **kwargs):
-        args = tuple([HDict(arg) if isinstance(arg, dict) else arg for arg in args])
-        kwargs = {k: HDict(v) if isinstance(v, dict) else v for k, v in kwargs.items()}
-        return func(*args, **kwargs)
-
-    return wrapped
-
-@hash_dict
-@lru_cache(maxsize=512)  # each binary is ~1MB, so 512MB cache
 def run_nvcc_and_return_bytes(gpu: str, solution_code: str, output_name: str) -> bytes:
-    """Compile source files with nvcc and return the path to the compiled binary
+    """Compile source files with nvcc and return the bytes of the compiled binary
+    
+    Compiled binaries are cached on disk under NVCC_CACHE_DIR, so that
+    solutions compiled before a restart do not invoke nvcc again. Hot entries
+    are served from the OS page cache rather than kept in memory here, except
+    for a small in-memory fallback for binaries that could not be written to
+    disk. Concurrent calls for the same code share a single compilation.
     
     Args:
         gpu (str): GPU type to use
-        files (dict[str, str]): Code files (file name -> content)
+        solution_code (str): CUDA source code of the solution
         output_name (str): Output library name
         
     Returns:
-        Path: Path to the compiled shared library
+        bytes: Contents of the compiled shared library
         
     Raises:
         NVCCError: If compilation fails
     """
-    # Create a temporary file for output that won't be deleted
-    output_file = tempfile.NamedTemporaryFile(delete=False, suffix=f".lib{output_name}.so")
-    output_file.close()
-    out_path = Path(output_file.name)
-    out_path.unlink()  # Remove the file so nvcc can create it
-    
+    cache_key = nvcc_cache_key(gpu, solution_code)
+
+    with _nvcc_lock:
+        future = _nvcc_futures.get(cache_key)
+        is_owner = future is None
+        if is_owner:
+            future = Future()
+            _nvcc_futures[cache_key] = future
+
+    if is_owner:
+        try:
+            future.set_result(_compile_solution(gpu, solution_code, output_name, cache_key))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with _nvcc_lock:
+                del _nvcc_futures[cache_key]
+
+    return future.result()
+
+
+def _compile_solution(gpu: str, solution_code: str, output_name: str, cache_key: str) -> bytes:
+    """Compile the solution code with nvcc, going through the on-disk cache"""
+    global _nvcc_inflight
+
+    cache_path = NVCC_CACHE_DIR / f"{cache_key}.so"
+    try:
+        bytes_of_file = cache_path.read_bytes()
+    except OSError:
+        # Missing, or pruned by another container in the meantime
+        bytes_of_file = None
+
+    if bytes_of_file is not None:
+        try:
+            # Bump the mtime so pruning evicts the least recently used entries
+            os.utime(cache_path)
+        except OSError:
+            pass
+        return bytes_of_file
+
+    with _nvcc_lock:
+        if cache_key in _nvcc_fallback_cache:
+            _nvcc_fallback_cache.move_to_end(cache_key)
+            return _nvcc_fallback_cache[cache_key]
+
     with tempfile.TemporaryDirectory() as td:
         path = Path(td)
         
-        # Write the source files
-        (path / "solution.cu").write_text(solution_code)
-        
-        # For a shared library, we need the solution.cu file
+        # Write the source file, nvcc builds the shared library next to it
         src_path = path / "solution.cu"
+        src_path.write_text(solution_code)
+        out_path = path / f"lib{output_name}.so"
         
-        # Compile with nvcc
-        cmd = nvcc_command(gpu, [src_path], out_path)
-        process = subprocess.run(cmd, capture_output=True, text=True)
+        # Compile with nvcc. Solutions export a host-side `extern "C" solution`
+        # that launches kernels with <<<>>>, so NVRTC (device code only) can't build them
+        with _nvcc_inflight_lock:
+            _nvcc_inflight += 1
+            threads = NVCC_MAX_THREADS if _nvcc_inflight == 1 else 1
+        try:
+            cmd = nvcc_command(gpu, [src_path], out_path, threads)
+            process = subprocess.run(cmd, capture_output=True, text=True)
+        finally:
+            with _nvcc_inflight_lock:
+                _nvcc_inflight -= 1
         
         # Check for compilation errors
         if process.returncode != 0:
             raise NVCCError(process.stderr)
-    
-    bytes_of_file = out_path.read_bytes()
-    out_path.unlink()
+        
+        bytes_of_file = out_path.read_bytes()
+
+    # Write to a uniquely named temporary file first so readers never see a partial
+    # binary, even with several containers writing to the same cache volume
+    tmp_path = None
+    try:
+        NVCC_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=NVCC_CACHE_DIR, prefix="tmp.", suffix=".part")
+        tmp_path = Path(tmp_name)
+        with open(fd, "wb") as f:
+            f.write(bytes_of_file)
+        os.replace(tmp_path, cache_path)
+        prune_nvcc_cache()
+    except OSError:
+        # The disk cache is best-effort, compilation already succeeded
+        if tmp_path is not None:
+            tmp_path.unlink(missing_ok=True)
+        with _nvcc_lock:
+            _nvcc_fallback_cache[cache_key] = bytes_of_file
+            if len(_nvcc_fallback_cache) > NVCC_FALLBACK_CACHE_SIZE:
+                _nvcc_fallback_cache.popitem(last=False)
+
     return bytes_of_file
 
 
+def prune_nvcc_cache(max_entries: int = NVCC_CACHE_MAX_ENTRIES):
+    """
+    Prune the on-disk nvcc cache down to the max_entries most recently used
+    binaries, and remove temp files left behind by interrupted writes.
+    Safe to run by hand (or from a cron job) to shrink the cache.
+    """
+    entries = []
+    for path in NVCC_CACHE_DIR.iterdir():
+        try:
+            mtime = path.stat().st_mtime
+        except FileNotFoundError:
+            continue
+        if path.name.startswith("tmp."):
+            if time.time() - mtime > NVCC_CACHE_TMP_MAX_AGE:
+                path.unlink(missing_ok=True)
+        elif path.suffix == ".so":
+            entries.append((mtime, path))
+
+    entries.sort(reverse=True)
+    for _, path in entries[max_entries:]:
+        path.unlink(missing_ok=True)
+
+
 def read_bytes_as_cuda_lib(compiled_lib: bytes):
-    """Read bytes of the solution code and compile it into a CUDA library"""
-    if isinstance(compiled_lib, bytes):
+    """Read bytes of the solution code and compile it into a CUDA library
+    
+    Each check or benchmark loads its library once, in a fresh subprocess
+    (see subproc_generator), so loaded handles are not cached here.
+    """
+    if isinstance(compiled_lib, bytes) and hasattr(os, "memfd_create"):
+        # Load from an anonymous in-memory file instead of a round-trip through /tmp.
+        # The dynamic linker matches already loaded libraries by path, so the fd is
+        # kept open for the life of the library (ctypes never dlcloses it): closing
+        # it would let a later load reuse the same /proc/self/fd/<n> path and get
+        # this library back instead of its own.
+        fd = os.memfd_create("cuda_lib", os.MFD_CLOEXEC)
+        try:
+            with open(fd, "wb", closefd=False) as f:
+                f.write(compiled_lib)
+            cuda_lib = ctypes.CDLL(f"/proc/self/fd/{fd}")
+        except BaseException:
+            os.close(fd)
+            raise
+        cuda_lib._memfd = fd
+    elif isinstance(compiled_lib, bytes):
         temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.so')
         temp_file_path = temp_file.name
         try:
@@ -156,18 +298,42 @@ def read_bytes_as_cuda_lib(compiled_lib: bytes):
     
     return cuda_lib
 
-def cast_to_ctype(data, argtypes, language="cuda"):
-    """Cast data to ctypes"""
-    data_casted = []
-    if language == "cuda":
-        for tensor, argtype in zip(data, argtypes):
-            if isinstance(tensor, torch.Tensor):
-                data_casted.append(ctypes.cast(tensor.data_ptr(), argtype))
-            else:
-                data_casted.append(argtype(tensor))
-        return data_casted
-    else:
-        return data
+@lru_cache(maxsize=None)
+def make_ctype_caster(argtypes: tuple):
+    """
+    Build a function that casts solution arguments to the given ctypes argtypes.
+    How each argument is converted is decided once per signature, not on every call:
+    pointer arguments take a tensor's data pointer, the rest are wrapped in their ctype.
+    """
+    def pointer_caster(argtype):
+        def cast(value):
+            if hasattr(value, "data_ptr"):
+                return ctypes.cast(value.data_ptr(), argtype)
+            return argtype(value)
+        return cast
+
+    # POINTER(...) types expose `contents`, c_void_p is the untyped pointer
+    converters = tuple(
+        pointer_caster(argtype) if hasattr(argtype, "contents") or issubclass(argtype, ctypes.c_void_p) else argtype
+        for argtype in argtypes
+    )
+
+    def cast_args(*args):
+        if len(args) != len(converters):
+            raise TypeError(f"Solution takes {len(converters)} arguments but {len(args)} were given")
+        return tuple(convert(arg) for convert, arg in zip(converters, args))
+
+    return cast_args
+
+def get_output_buffer(previous_output: torch.Tensor | None, expected_output: torch.Tensor) -> torch.Tensor:
+    """
+    Get a zeroed CUDA output tensor like the expected output, reusing the previous
+    test case's buffer when its shape, dtype and stride match, or allocating a new one.
+    """
+    layout = (expected_output.shape, expected_output.dtype, expected_output.stride())
+    if previous_output is not None and (previous_output.shape, previous_output.dtype, previous_output.stride()) == layout:
+        return previous_output.zero_()
+    return torch.zeros_like(expected_output, device='cuda')
 
 def load_problem_module(problem_type: str, problem_def: str = None) -> Problem:
     """
@@ -185,13 +351,11 @@ def load_problem_module(problem_type: str, problem_def: str = None) -> Problem:
     """
     try:
         if problem_def is not None:
-            spec = importlib.util.spec_from_loader(
-                problem_type,
-                loader=None,
-                origin="<string>"
-            )
-            module = ModuleType(spec.name)
-            exec(problem_def, module.__dict__)
+            # Each check or benchmark runs in a fresh subprocess, so caching the
+            # compiled code object here would never hit
+            code = compile(problem_def, f"<{problem_type}>", "exec")
+            module = ModuleType(problem_type)
+            exec(code, module.__dict__)
             
             problem_class = getattr(module, problem_type)
             return problem_class()
@@ -202,26 +366,53 @@ def load_problem_module(problem_type: str, problem_def: str = None) -> Problem:
             detail=f"Problem type '{problem_type}' not found or failed to load: {str(e)}"
         )
 
-def prepare_gpu():
+# Warm-up CUDA graphs by (size, iters), captured once per process and replayed
+# on every prepare_gpu call, along with the tensors they read and write
+_warmup_graphs: dict[tuple[int, int], tuple[torch.cuda.CUDAGraph, torch.Tensor, torch.Tensor]] = {}
+
+def get_warmup_graph(size: int, iters: int) -> torch.cuda.CUDAGraph:
+    """
+    Get the CUDA graph of `iters` warm-up matmuls of a size x size tensor,
+    capturing it on first use. Capturing runs one extra eager matmul first
+    so cuBLAS is initialized outside the capture.
+    """
+    key = (size, iters)
+    if key not in _warmup_graphs:
+        warmup_tensor = torch.rand(size, size, device='cuda')
+        warmup_output = torch.matmul(warmup_tensor, warmup_tensor.t())
+        graph = torch.cuda.CUDAGraph()
+        with torch.cuda.graph(graph):
+            for _ in range(iters):
+                torch.matmul(warmup_tensor, warmup_tensor.t(), out=warmup_output)
+        _warmup_graphs[key] = (graph, warmup_tensor, warmup_output)
+    return _warmup_graphs[key][0]
+
+def prepare_gpu(size=2048, iters=3, sleep=0.0):
     """
     Prepare the GPU for consistent benchmarking with a simple warm-up.
+    
+    Args:
+        size: Side length of the square matrix used for the warm-up matmuls
+        iters: Number of warm-up matmuls to run
+        sleep: Seconds to wait afterwards for thermal stabilization (off by default)
     """
     # Clear GPU caches
     torch.cuda.empty_cache()
     
-    # Run a moderate workload to heat up the GPU to a stable temperature
-    warmup_tensor = torch.rand(5000, 5000, device='cuda')
-    for _ in range(10):
-        torch.matmul(warmup_tensor, warmup_tensor.t())
-    torch.cuda.synchronize()
-    del warmup_tensor
-    torch.cuda.empty_cache()
+    # Run a short workload so the CUDA context, cuBLAS and GPU clocks are warmed up
+    # before timing. It is too short to settle the GPU temperature, that is what
+    # sleep is for. The matmuls are replayed from a graph captured once per process
+    if iters > 0:
+        get_warmup_graph(size, iters).replay()
+        torch.cuda.synchronize()
     
-    time.sleep(0.5)
+    if sleep > 0:
+        time.sleep(sleep)
 
 
 def run_dynamic_benchmark(solution_func, problem, test_id, test_case, input_tensors, actual_output, 
-                          language="cuda", min_iterations=5, max_iterations=15, target_cv=0.02, long_kernel_threshold=1.0):
+                          language="cuda", min_iterations=5, max_iterations=15, target_cv=0.02, long_kernel_threshold=1.0,
+                          max_batch_size=16, batch_time=0.1):
     """
     Run a CUDA benchmark with dynamic stopping based on GFLOPS variance.
     If kernel execution time exceeds threshold, run fixed number of iterations instead.
@@ -237,6 +428,8 @@ def run_dynamic_benchmark(solution_func, problem, test_id, test_case, input_tens
         max_iterations: Maximum number of iterations to run
         target_cv: Target coefficient of variation to achieve
         long_kernel_threshold: Time in seconds above which CV convergence is skipped
+        max_batch_size: Maximum number of launches queued before waiting on the GPU
+        batch_time: Target time in seconds for one batch of launches
         
     Returns:
         benchmark_result: Dictionary with benchmark results
@@ -244,9 +437,11 @@ def run_dynamic_benchmark(solution_func, problem, test_id, test_case, input_tens
     # Prepare pointers for CUDA
     extra_params = problem.get_extra_params(test_case)
     if language == "cuda":
-        input_ptrs = cast_to_ctype(input_tensors, solution_func.argtypes[:len(input_tensors)], language)
-        output_ptr = ctypes.cast(actual_output.data_ptr(), solution_func.argtypes[len(input_tensors)])
-        extra_params_casted = cast_to_ctype(extra_params, solution_func.argtypes[-len(extra_params):], language)
+        # Build the argument tuple once so launches inside the timing loop don't allocate
+        cast_args = make_ctype_caster(tuple(solution_func.argtypes))
+        solution_args = cast_args(*input_tensors, actual_output, *extra_params)
+    elif language == "python":
+        solution_args = (*input_tensors, actual_output, *extra_params)
     # Calculate FLOPS for this test case
     flops = problem.get_flops(test_case)
     
@@ -258,10 +453,7 @@ def run_dynamic_benchmark(solution_func, problem, test_id, test_case, input_tens
     end_event = torch.cuda.Event(enable_timing=True)
     
     start_event.record()
-    if language == "cuda":
-        solution_func(*(input_ptrs + [output_ptr] + extra_params_casted))
-    elif language == "python":
-        solution_func(*(list(input_tensors) + [actual_output] + list(extra_params)))
+    solution_func(*solution_args)
     end_event.record()
     torch.cuda.synchronize()
     
@@ -276,54 +468,62 @@ def run_dynamic_benchmark(solution_func, problem, test_id, test_case, input_tens
     else:
         # For short kernels, use CV-based convergence with max_iterations cap
         target_iterations = max_iterations
+
+    # For short kernels, queue a batch of launches with an event pair around each
+    # one and wait only on the last event, so the CPU keeps the GPU fed instead
+    # of synchronizing after every launch. The host launch gap is only left out of
+    # a sample while the previous kernel is still running: kernels shorter than a
+    # host launch drain the GPU, so their start event fires early and the gap is
+    # counted as with a sync per launch. Batching (and so any change versus a sync
+    # per launch) applies to kernels under batch_time / 2
+    if is_long_kernel:
+        batch_size = 1
+    else:
+        batch_size = max(1, min(max_batch_size, int(batch_time / initial_runtime)))
+    start_events = [torch.cuda.Event(enable_timing=True) for _ in range(batch_size)]
+    end_events = [torch.cuda.Event(enable_timing=True) for _ in range(batch_size)]
     
-    # Collect runtime measurements
-    runtimes = [initial_runtime]  # Include the initial runtime
-    gflops_measurements = [(flops / initial_runtime) / 1e9]  # Convert to GFLOPS
+    # Keep running statistics (Welford's algorithm for the GFLOPS variance)
+    # instead of every measurement, starting with the initial run
+    num_samples = 1
+    total_runtime = initial_runtime
+    mean_gflops = (flops / initial_runtime) / 1e9  # Convert to GFLOPS
+    m2_gflops = 0.0
 
-    for iteration in range(1, target_iterations):  # Start from 1 since we already did one iteration
-        start_event = torch.cuda.Event(enable_timing=True)
-        end_event = torch.cuda.Event(enable_timing=True)
-        
-        # Start timing
-        start_event.record()
-        
-        # Run the kernel
-        if language == "cuda":
-            solution_func(*(input_ptrs + [output_ptr] + extra_params_casted))
-        elif language == "python":
-            solution_func(*(list(input_tensors) + [actual_output] + list(extra_params)))
-        
-        # End timing
-        end_event.record()
-        torch.cuda.synchronize()
-        
-        elapsed_time = start_event.elapsed_time(end_event) / 1000.0  # Convert to seconds
-        runtimes.append(elapsed_time)
+    converged = False
+    while num_samples < target_iterations and not converged:
+        launches = min(batch_size, target_iterations - num_samples)
         
-        # Calculate GFLOPS
-        gflops = (flops / elapsed_time) / 1e9  # Convert to GFLOPS
-        gflops_measurements.append(gflops)
+        # Run the kernel. This is not replayed from a CUDA graph: ctypes solutions
+        # launch on the legacy default stream, which stream capture does not record
+        for i in range(launches):
+            start_events[i].record()
+            solution_func(*solution_args)
+            end_events[i].record()
+        end_events[launches - 1].synchronize()
         
-        # Check if we've done enough iterations and the variance is low enough
-        # Only do this check for short kernels
-        if not is_long_kernel and iteration + 1 >= min_iterations:
-            mean_gflops = statistics.mean(gflops_measurements)
+        for i in range(launches):
+            elapsed_time = start_events[i].elapsed_time(end_events[i]) / 1000.0  # Convert to seconds
+            total_runtime += elapsed_time
             
-            # Can only calculate stdev with more than 1 sample
-            if len(gflops_measurements) > 1:
-                stdev_gflops = statistics.stdev(gflops_measurements)
+            # Calculate GFLOPS
+            gflops = (flops / elapsed_time) / 1e9  # Convert to GFLOPS
+            num_samples += 1
+            delta = gflops - mean_gflops
+            mean_gflops += delta / num_samples
+            m2_gflops += delta * (gflops - mean_gflops)
+            
+            # Check if we've done enough iterations and the variance is low enough
+            # Only do this check for short kernels
+            if not is_long_kernel and num_samples >= min_iterations:
+                stdev_gflops = math.sqrt(m2_gflops / (num_samples - 1))
                 cv = stdev_gflops / mean_gflops if mean_gflops > 0 else float('inf')
                 
                 if cv < target_cv:
+                    converged = True
                     break
 
-    if len(runtimes) > 1:
-        mean_runtime = statistics.mean(runtimes)
-    else:
-        mean_runtime = runtimes[0]
-
-    mean_gflops = statistics.mean(gflops_measurements)
+    mean_runtime = total_runtime / num_samples
 
     benchmark_result = {
         "name": test_case["name"],
@@ -343,26 +543,26 @@ def convert_slug_to_module_name(slug: str) -> str:
 
 def subproc_generator(timeout=None):
     def _subproc_generator(func):
-        def subproc_wrapper(my_queue, *args, **kwargs):
+        def subproc_wrapper(conn, *args, **kwargs):
             try:
                 result = func(*args, **kwargs)
+                # Forward events one at a time: they are live progress updates (about one
+                # per test case), so batching them would only delay what the client sees
                 for ev in result:
-                    my_queue.put(ev)
+                    conn.send(ev)
             finally:
-                my_queue.put(None)
+                conn.send(None)
+                conn.close()
 
         @wraps(func)
         def wrapper(*args, **kwargs):
-            my_queue = mp.Queue()
-            proc = mp.Process(target=subproc_wrapper, args=(my_queue,) + args, kwargs=kwargs)
+            parent_conn, child_conn = mp.Pipe(duplex=False)
+            proc = mp.Process(target=subproc_wrapper, args=(child_conn,) + args, kwargs=kwargs)
             proc.start()
+            # Drop our copy of the write end, so a crashed child shows up as EOF
+            child_conn.close()
             while True:
-                try:
-                    event = my_queue.get(timeout=timeout)
-                    yield event
-                    if event is None:
-                        break
-                except queue.Empty:
+                if not parent_conn.poll(timeout):
                     yield {
                         "status": "TIME_LIMIT_EXCEEDED",
                         "message": "Time Limit Exceeded",
@@ -371,8 +571,24 @@ def subproc_generator(timeout=None):
                     proc.terminate()
                     break
 
+                try:
+                    event = parent_conn.recv()
+                except EOFError:
+                    proc.join()
+                    yield {
+                        "status": "RUNTIME_ERROR",
+                        "message": "Runtime Error",
+                        "details": f"Process exited unexpectedly with exit code {proc.exitcode}"
+                    }
+                    break
+
+                yield event
+                if event is None:
+                    break
+
+            parent_conn.close()
             proc.join()
             proc.close()
 
         return wrapper
-    return _subproc_generator
\ No newline at end of file
+    return _subproc_generator